@@ -1,5 +1,12 @@
 import argparse
-from topho import run
+from topho import TRANSFER_WORKERS, run
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
 def main():
@@ -26,6 +33,12 @@ def main():
         default="token.json",
         help="Path to store/retrieve OAuth token (default: token.json)"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=positive_int,
+        default=TRANSFER_WORKERS,
+        help=f"Number of files to transfer concurrently (default: {TRANSFER_WORKERS})"
+    )
 
     args = parser.parse_args()
 
@@ -37,7 +50,8 @@ def main():
         root_folder_name=args.root_folder,
         max_video_seconds=args.max_video_seconds,
         credentials_path=args.credentials,
-        token_path=args.token
+        token_path=args.token,
+        workers=args.workers
     )
 
 
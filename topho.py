@@ -1,12 +1,23 @@
 import os
-import io
 import json
+import atexit
+import threading
 import requests
 import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import AuthorizedSession, Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Scopes for Drive (read-only) and Photos (append-only)
 SCOPES = [
@@ -16,14 +27,59 @@ SCOPES = [
     'https://www.googleapis.com/auth/photoslibrary.readonly.appcreateddata'
 ]
 
-IMAGE_EXTS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.heic', '.dng'}
-VIDEO_EXTS = {'.mp4', '.mov', '.avi', '.mkv', '.wav'}
+IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.heic', '.dng'})
+VIDEO_EXTS = frozenset({'.mp4', '.mov', '.avi', '.mkv'})
+
+# Item kind by exact MIME type, then by MIME major type, then by file suffix
+_MIME_KIND = {'application/vnd.google-apps.folder': 'folder'}
+_MIME_MAJOR_KIND = {'video': 'video', 'image': 'image'}
+_IMAGE_SUFFIXES = tuple(IMAGE_EXTS)
+_VIDEO_SUFFIXES = tuple(VIDEO_EXTS)
 
 IMPORTED_FILE = 'imported.json'
 SKIPPED_FILE = 'skipped.json'
 MISSED_FILE = 'missedimages.txt'
 ALLMISSED_FILE = 'allmissed.txt'
 
+# Transfers are network-bound, so overlap this many download+upload pairs by default
+TRANSFER_WORKERS = 16
+# Files listed ahead of the transfer pool, per worker, before listing pauses
+PENDING_PER_WORKER = 4
+# Media is piped from Drive to Photos in chunks of this size
+CHUNK_SIZE = 1 << 20
+# Files above this size use resumable uploads, sent in UPLOAD_CHUNK_SIZE pieces
+# (a multiple of the 256 KiB granularity Photos requires for non-final chunks)
+RESUMABLE_THRESHOLD = 16 << 20
+UPLOAD_CHUNK_SIZE = 8 << 20
+RESUME_RETRIES = 5
+# Those large files are also downloaded as this many parallel Range requests
+RANGE_WORKERS = 4
+# Drive rejects `q` filters longer than ~2 KB; sibling folders are OR-ed up to this
+MAX_QUERY_LENGTH = 2000
+# Per-item fields requested when listing folder contents
+ITEM_FIELDS = "files(id,name,mimeType,parents,size,videoMediaMetadata/durationMillis)"
+# batchCreate takes at most 50 items; batches for one album are sent in parallel
+ALBUM_BATCH_SIZE = 50
+BATCH_WORKERS = 8
+# batchCreate is a POST, so 429s are retried here rather than by the adapter
+RATE_LIMIT_RETRIES = 5
+# imported.json / skipped.json are rewritten at most once per this many seconds
+FLUSH_INTERVAL = 2.0
+
+# Progress state shared with the background flusher
+_state_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_dirty = threading.Event()
+_dirty_paths = set()
+_tracked = {}
+_flusher = None
+
+_BATCH_POOL = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+
+# Log files stay open (buffered) until close_logs(), keyed by path
+_log_lock = threading.Lock()
+_log_handles = {}
+
 
 def authenticate(credentials_path: str, token_path: str) -> Credentials:
     """
@@ -32,207 +88,671 @@ def authenticate(credentials_path: str, token_path: str) -> Credentials:
     creds = None
     if os.path.exists(token_path):
         creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-    else:
+    if creds and creds.valid:
+        return creds
+    if creds and creds.expired and creds.refresh_token:
+        try:
+            creds.refresh(Request())
+        except RefreshError as e:
+            # Revoked, or expired (refresh tokens last 7 days for apps in testing)
+            print(f"⚠️ Could not refresh saved token, signing in again: {e}")
+            creds = None
+    if not creds or not creds.valid:
         flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
         creds = flow.run_local_server(port=0)
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
+    with open(token_path, 'w') as token:
+        token.write(creds.to_json())
     return creds
 
 
+def build_session(creds: Credentials, workers: int = TRANSFER_WORKERS) -> requests.Session:
+    """
+    Keep-alive session shared by every API call in a run; refreshes creds as needed.
+    The per-host pool is sized so `workers` transfers (each with its ranged
+    downloads) plus album batches never queue for a connection.
+    """
+    # Upload bodies are often one-shot streams, so a 401 must not be replayed
+    # with an exhausted body; expiring creds are still refreshed before each request
+    session = AuthorizedSession(creds, refresh_status_codes=())
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+    session.mount("https://", HTTPAdapter(
+        pool_maxsize=workers * RANGE_WORKERS + BATCH_WORKERS, max_retries=retry
+    ))
+    # Google APIs only gzip JSON responses when the User-Agent also mentions gzip
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    session.headers["User-Agent"] = f"topho {requests.utils.default_user_agent()} (gzip)"
+    return session
+
+
+def error_message(resp: requests.Response) -> str:
+    try:
+        return resp.json().get('error', {}).get('message', resp.text)
+    except ValueError:
+        return resp.text
+
+
+def drive_list(session: requests.Session, params: dict) -> dict:
+    resp = session.get("https://www.googleapis.com/drive/v3/files", params=params)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Drive list failed ({resp.status_code}): {error_message(resp)}")
+    return resp.json()
+
+
 def load_json(path, default):
     if os.path.exists(path):
+        if orjson is not None:
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
         with open(path, 'r') as f:
             return json.load(f)
     return default
 
 
-def save_json(path, data):
-    with open(path, 'w') as f:
-        json.dump(data, f, indent=2)
+def save_json(path, data, human=True):
+    """
+    Atomically write data to path; human=False drops the indentation.
+    """
+    tmp_path = f"{path}.tmp"
+    if orjson is not None:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if human else 0))
+    else:
+        with open(tmp_path, 'w') as f:
+            if human:
+                json.dump(data, f, indent=2)
+            else:
+                json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def start_state_flusher(imported: set, skipped: dict) -> None:
+    """
+    Persist imported/skipped from a background thread whenever they change,
+    at most once every FLUSH_INTERVAL seconds.
+    """
+    global _flusher
+    with _state_lock:
+        _tracked[IMPORTED_FILE] = imported
+        _tracked[SKIPPED_FILE] = skipped
+    if _flusher is None:
+        _flusher = threading.Thread(target=_flush_loop, daemon=True)
+        _flusher.start()
+
+
+def _flush_loop():
+    while True:
+        _dirty.wait()
+        time.sleep(FLUSH_INTERVAL)
+        flush_state()
+
+
+def flush_state() -> None:
+    with _flush_lock:
+        with _state_lock:
+            _dirty.clear()
+            # Only copy what changed; a skip should not re-serialize all of imported
+            snapshot = {}
+            for path in _dirty_paths:
+                data = _tracked[path]
+                snapshot[path] = list(data) if isinstance(data, set) else dict(data)
+            _dirty_paths.clear()
+        # Machine-read files, so skip the indentation
+        for path, data in snapshot.items():
+            save_json(path, data, human=False)
+
+
+atexit.register(flush_state)
+
+
+def mark_imported(imported: set, file_id: str) -> None:
+    with _state_lock:
+        imported.add(file_id)
+        _dirty_paths.add(IMPORTED_FILE)
+    _dirty.set()
+
+
+def mark_skipped(skipped: dict, file_id: str, reason: str) -> None:
+    with _state_lock:
+        skipped[file_id] = reason
+        _dirty_paths.add(SKIPPED_FILE)
+    _dirty.set()
+
+
+def append_log(path, line):
+    with _log_lock:
+        fh = _log_handles.get(path)
+        if fh is None:
+            fh = _log_handles[path] = open(path, 'a', encoding='utf-8', buffering=1 << 16)
+        fh.write(line)
+
+
+def close_logs() -> None:
+    with _log_lock:
+        for fh in _log_handles.values():
+            fh.close()
+        _log_handles.clear()
+
+
+atexit.register(close_logs)
 
 
 def log_missing(folder, name, reason):
-    with open(MISSED_FILE, 'a', encoding='utf-8') as f:
-        f.write(f"{folder} - {name} : {reason}\n")
+    append_log(MISSED_FILE, f"{folder} - {name} : {reason}\n")
 
 
 def log_allmissed(folder, name, file_id, reason):
-    with open(ALLMISSED_FILE, 'a', encoding='utf-8') as f:
-        f.write(f"{folder} - {name} - {file_id} : {reason}\n")
+    append_log(ALLMISSED_FILE, f"{folder} - {name} - {file_id} : {reason}\n")
 
 
-def list_all_items(drive_service, folder_id):
-    query = f"'{folder_id}' in parents"
-    items = []
+def parent_queries(folder_ids):
+    """
+    Yield `'<id>' in parents or ...` filters covering folder_ids, each under MAX_QUERY_LENGTH.
+    """
+    batch = []
+    length = 0
+    for fid in folder_ids:
+        clause = f"'{fid}' in parents"
+        if batch and length + len(clause) + 4 > MAX_QUERY_LENGTH:
+            yield " or ".join(batch)
+            batch = []
+            length = 0
+        batch.append(clause)
+        length += len(clause) + 4
+    if batch:
+        yield " or ".join(batch)
+
+
+def walk_pages(session: requests.Session, query: str, fields: str = ITEM_FIELDS):
+    """
+    Yield the files matching one Drive query, one page (list) at a time.
+    """
     page_token = None
     while True:
-        resp = drive_service.files().list(
-            q=query,
-            pageSize=1000,
-            fields="nextPageToken, files(id,name,mimeType,videoMediaMetadata(durationMillis))",
-            pageToken=page_token
-        ).execute()
-        items.extend(resp.get('files', []))
+        params = {
+            "q": query,
+            "pageSize": 1000,
+            "fields": f"nextPageToken,{fields}",
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        resp = drive_list(session, params)
+        yield resp.get('files', [])
         page_token = resp.get('nextPageToken')
         if not page_token:
             break
-    return items
 
 
-def download_file(drive_service, file_id):
-    request = drive_service.files().get_media(fileId=file_id)
-    buffer = io.BytesIO()
-    downloader = MediaIoBaseDownload(buffer, request)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    return buffer.getvalue()
+def list_all_items(session: requests.Session, folder_ids):
+    """
+    Yield the children of every folder in folder_ids with as few queries as
+    possible. The queries are paged through one after another, with only the
+    next page fetched in the background while the current one is consumed,
+    so listing stalls whenever the caller stops pulling items.
+    """
+    pages = (page for query in parent_queries(folder_ids) for page in walk_pages(session, query))
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        ahead = prefetch.submit(next, pages, None)
+        while True:
+            page = ahead.result()
+            if page is None:
+                return
+            ahead = prefetch.submit(next, pages, None)
+            yield from page
+
+
+def stream_drive(session: requests.Session, file_id: str) -> requests.Response:
+    """
+    Open a streamed download of a Drive file; the caller must close it.
+    """
+    resp = session.get(
+        f"https://www.googleapis.com/drive/v3/files/{file_id}",
+        params={"alt": "media"},
+        stream=True
+    )
+    if resp.status_code == 200:
+        return resp
+    try:
+        msg = error_message(resp)
+    finally:
+        resp.close()
+    raise RuntimeError(f"Download failed ({resp.status_code}): {msg}")
 
 
-def upload_to_photos(token: str, file_bytes: bytes, file_name: str) -> str:
+def iter_drive_ranges(session: requests.Session, file_id: str, size: int, block_size: int):
+    """
+    Yield a Drive file in order as block_size pieces, keeping up to
+    RANGE_WORKERS Range requests in flight ahead of the consumer.
+    """
+    def fetch(lo):
+        hi = min(lo + block_size, size) - 1
+        resp = session.get(
+            f"https://www.googleapis.com/drive/v3/files/{file_id}",
+            params={"alt": "media"},
+            headers={"Range": f"bytes={lo}-{hi}"}
+        )
+        if resp.status_code != 206:
+            raise RuntimeError(f"Download failed ({resp.status_code}): {error_message(resp)}")
+        return resp.content
+
+    offsets = iter(range(0, size, block_size))
+    with ThreadPoolExecutor(max_workers=RANGE_WORKERS) as pool:
+        pending = deque(pool.submit(fetch, lo) for lo in islice(offsets, RANGE_WORKERS))
+        while pending:
+            block = pending.popleft().result()
+            lo = next(offsets, None)
+            if lo is not None:
+                pending.append(pool.submit(fetch, lo))
+            yield block
+
+
+def upload_to_photos(session: requests.Session, data, file_name: str) -> str:
     headers = {
-        "Authorization": f"Bearer {token}",
         "Content-type": "application/octet-stream",
         "X-Goog-Upload-File-Name": file_name,
         "X-Goog-Upload-Protocol": "raw",
     }
-    resp = requests.post(
+    resp = session.post(
         "https://photoslibrary.googleapis.com/v1/uploads",
         headers=headers,
-        data=file_bytes
+        data=data
     )
     if resp.status_code == 200:
         return resp.text
-    try:
-        err = resp.json().get('error', {})
-        msg = err.get('message', resp.text)
-    except ValueError:
-        msg = resp.text
-    raise RuntimeError(f"Upload failed ({resp.status_code}): {msg}")
+    raise RuntimeError(f"Upload failed ({resp.status_code}): {error_message(resp)}")
+
+
+def read_blocks(chunks, block_size: int):
+    """
+    Regroup an iterable of byte chunks into blocks of exactly block_size
+    (the last one may be shorter).
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        if not buffer and len(chunk) == block_size:
+            yield chunk
+            continue
+        buffer += chunk
+        while len(buffer) >= block_size:
+            yield bytes(buffer[:block_size])
+            del buffer[:block_size]
+    if buffer:
+        yield bytes(buffer)
 
 
-def create_album(token: str, title: str) -> str:
-    headers = {"Authorization": f"Bearer {token}"}
-    resp = requests.post(
+def query_upload_offset(session: requests.Session, upload_url: str) -> int:
+    resp = session.post(upload_url, headers={"X-Goog-Upload-Command": "query"})
+    if resp.status_code != 200:
+        raise RuntimeError(f"Upload query failed ({resp.status_code}): {error_message(resp)}")
+    return int(resp.headers["X-Goog-Upload-Size-Received"])
+
+
+def upload_resumable(session: requests.Session, chunks, file_name: str, size: int, mime: str) -> str:
+    """
+    Upload a large file with the resumable protocol. A chunk that fails with
+    a server error or dropped connection is resumed from the offset Photos
+    acknowledges instead of restarting the whole file.
+    """
+    start = session.post(
+        "https://photoslibrary.googleapis.com/v1/uploads",
+        headers={
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Content-Type": mime,
+            "X-Goog-Upload-File-Name": file_name,
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Raw-Size": str(size),
+        }
+    )
+    if start.status_code != 200:
+        raise RuntimeError(f"Upload start failed ({start.status_code}): {error_message(start)}")
+    upload_url = start.headers["X-Goog-Upload-URL"]
+
+    offset = 0
+    resp = None
+    for block in read_blocks(chunks, UPLOAD_CHUNK_SIZE):
+        end = offset + len(block)
+        command = "upload, finalize" if end >= size else "upload"
+        sent = offset
+        for attempt in range(RESUME_RETRIES + 1):
+            try:
+                resp = session.post(
+                    upload_url,
+                    headers={"X-Goog-Upload-Command": command, "X-Goog-Upload-Offset": str(sent)},
+                    data=block[sent - offset:]
+                )
+                if resp.status_code == 200:
+                    break
+                if resp.status_code != 429 and resp.status_code < 500:
+                    raise RuntimeError(f"Upload failed ({resp.status_code}): {error_message(resp)}")
+            except requests.ConnectionError:
+                if attempt == RESUME_RETRIES:
+                    raise
+            if attempt == RESUME_RETRIES:
+                raise RuntimeError(f"Upload failed ({resp.status_code}): {error_message(resp)}")
+            time.sleep(2 ** attempt)
+            sent = max(offset, min(end, query_upload_offset(session, upload_url)))
+        offset = end
+    if resp is None or offset < size:
+        raise RuntimeError(f"Upload failed: Drive returned {offset} of {size} bytes")
+    return resp.text
+
+
+def create_album(session: requests.Session, title: str) -> str:
+    resp = session.post(
         "https://photoslibrary.googleapis.com/v1/albums",
-        headers=headers,
         json={"album": {"title": title}}
     )
     return resp.json().get('id') if resp.status_code == 200 else None
 
 
-def get_album_id(token: str, title: str) -> str:
-    headers = {"Authorization": f"Bearer {token}"}
-    next_page = None
+def list_all_albums(session: requests.Session):
+    albums = []
+    next_token = None
+
     while True:
-        params = {"pageSize": 50}
-        if next_page:
-            params["pageToken"] = next_page
-        resp = requests.get(
+        resp = session.get(
             "https://photoslibrary.googleapis.com/v1/albums",
-            headers=headers,
-            params=params
+            params={"pageSize": 50, "pageToken": next_token}
         )
         if resp.status_code != 200:
-            return None
+            print(f"⚠️ Failed to list albums: {resp.text}")
+            break
+
         data = resp.json()
-        for alb in data.get("albums", []):
-            if alb.get("title") == title:
-                return alb.get("id")
-        next_page = data.get("nextPageToken")
-        if not next_page:
+        albums.extend(data.get("albums", []))
+        next_token = data.get("nextPageToken")
+        if not next_token:
             break
-    return None
+
+    return albums
 
 
-def add_to_album(token: str, upload_tokens: list, album_id: str) -> None:
-    headers = {"Authorization": f"Bearer {token}"}
+def retry_after(resp: requests.Response, attempt: int) -> float:
+    """
+    Seconds to wait before retrying a rate-limited request.
+    """
+    try:
+        return float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return 2 ** attempt
+
+
+def add_to_album(session: requests.Session, upload_tokens: list, album_id: str) -> None:
     body = {
         "albumId": album_id,
         "newMediaItems": [{"simpleMediaItem": {"uploadToken": t}} for t in upload_tokens]
     }
-    resp = requests.post(
-        "https://photoslibrary.googleapis.com/v1/mediaItems:batchCreate",
-        headers=headers,
-        json=body
-    )
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        resp = session.post(
+            "https://photoslibrary.googleapis.com/v1/mediaItems:batchCreate",
+            json=body
+        )
+        if resp.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+            break
+        time.sleep(retry_after(resp, attempt))
     if resp.status_code != 200:
-        err = resp.json().get('error', {}).get('message', resp.text)
-        raise RuntimeError(f"Add to album failed ({resp.status_code}): {err}")
+        raise RuntimeError(f"Add to album failed ({resp.status_code}): {error_message(resp)}")
+
+
+class SizedStream:
+    """
+    Iterable request body of known length, so requests sends it with a
+    Content-Length header instead of chunked transfer encoding.
+    """
+
+    def __init__(self, chunks, size: int):
+        self.chunks = chunks
+        self.size = size
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def __len__(self):
+        return self.size
+
 
+def transfer_file(session: requests.Session, itm: dict) -> str:
+    """
+    Copy one Drive file into Photos, returning its upload token.
+    """
+    size = int(itm.get('size') or 0)
+    if size > RESUMABLE_THRESHOLD:
+        blocks = iter_drive_ranges(session, itm['id'], size, UPLOAD_CHUNK_SIZE)
+        return upload_resumable(session, blocks, itm['name'], size, itm['mimeType'])
+    with stream_drive(session, itm['id']) as resp:
+        body = resp.iter_content(CHUNK_SIZE)
+        if size:
+            body = SizedStream(body, size)
+        return upload_to_photos(session, body, itm['name'])
+
+
+def classify(mime: str, name: str) -> str:
+    """
+    Return 'folder', 'video', 'image' or 'skip' for a Drive item.
+    """
+    kind = _MIME_KIND.get(mime) or _MIME_MAJOR_KIND.get(mime.partition('/')[0])
+    if kind:
+        return kind
+    name = name.lower()
+    if name.endswith(_IMAGE_SUFFIXES):
+        return 'image'
+    if name.endswith(_VIDEO_SUFFIXES):
+        return 'video'
+    return 'skip'
+
+
+def check_item(itm, folder_name, imported, skipped, max_video_seconds):
+    """
+    Return the item's kind if it still needs work, or None after logging why
+    it is left alone.
+    """
+    fid = itm['id']
+    name = itm['name']
+    # Only files are ever recorded, so settle the common re-run case first
+    if fid in imported:
+        print(f"  ↳ Already imported {folder_name}/{name}")
+        return None
+    if fid in skipped:
+        print(f"  ↳ Skipped {folder_name}/{name}: {skipped[fid]}")
+        return None
+    kind = classify(itm['mimeType'], name)
+    if kind == 'folder':
+        return kind
+    if kind == 'skip':
+        log_missing(folder_name, name, 'unsupported')
+        return None
+    if kind == 'video':
+        dur_ms = itm.get('videoMediaMetadata', {}).get('durationMillis')
+        try:
+            dur = int(dur_ms)/1000 if dur_ms else 0
+        except Exception:
+            dur = 0
+        if dur > max_video_seconds:
+            reason = f"too long ({dur:.1f}s)"
+            log_missing(folder_name, name, reason)
+            mark_skipped(skipped, fid, reason)
+            return None
+    return kind
 
-def process_folder(drive_service, token, folder_id, folder_name, imported, skipped, max_video_seconds):
-    print(f"\n📁 Processing: {folder_name}")
-    items = list_all_items(drive_service, folder_id)
-    upload_tokens = []
-    for itm in items:
+
+def submit_album_batch(session, album_index, folder_name, batch):
+    """
+    Queue one batchCreate for folder_name's album, creating the album on
+    first use. Returns the future, or None if there is no album.
+    """
+    album_id = album_index.get(folder_name)
+    if not album_id:
+        album_id = create_album(session, folder_name)
+        if not album_id:
+            print(f"⚠️ Could not create/find album '{folder_name}'")
+            return None
+        album_index[folder_name] = album_id
+    return _BATCH_POOL.submit(add_to_album, session, batch, album_id)
+
+
+def process_tree(session, folders, imported, skipped, album_index, max_video_seconds,
+                 workers=TRANSFER_WORKERS):
+    """
+    Import a Drive folder tree from an explicit work queue.
+
+    Queued folders are listed with batched parent queries, page by page and
+    only as fast as the transfer pool drains: at most PENDING_PER_WORKER *
+    workers files are waiting on it at any time, and list_all_items fetches
+    no more than one page ahead of the items pulled. Upload tokens go to the
+    folder's album in batches as soon as a batch fills, and the remainder is
+    flushed when the folder's last transfer finishes. Album batches are reaped alongside the
+    transfers, so a rate-limited batchCreate never stalls the walk, and each
+    folder is reported once its last batch lands. If anything raises
+    (including Ctrl-C), queued transfers are cancelled and finished ones are
+    still recorded.
+    """
+    max_pending = workers * PENDING_PER_WORKER
+    queue = deque(folders)
+    listing = None
+    listing_folders = {}
+    names = {}
+    remaining = {}
+    tokens = {}
+    album_pending = {}
+    album_added = {}
+    album_failed = set()
+    futures = {}
+    album_futures = {}
+    in_flight = set()
+
+    def record_transfer(future):
+        itm, parent = futures.pop(future)
         fid = itm['id']
         name = itm['name']
-        mime = itm['mimeType']
-        ext = os.path.splitext(name)[1].lower()
-        is_image = mime.startswith('image/') or ext in IMAGE_EXTS
-        is_video = mime.startswith('video/') or ext in VIDEO_EXTS
-        if mime == 'application/vnd.google-apps.folder':
-            process_folder(
-                drive_service, token, fid,
-                f"{folder_name}/{name}", imported, skipped, max_video_seconds
-            )
-            continue
-        if not (is_image or is_video):
-            log_missing(folder_name, name, 'unsupported')
-            continue
-        if fid in imported:
-            print(f"  ↳ Already imported {name}")
-            continue
-        if fid in skipped:
-            print(f"  ↳ Skipped {name}: {skipped[fid]}")
-            continue
-        if is_video:
-            dur_ms = itm.get('videoMediaMetadata', {}).get('durationMillis')
-            try:
-                dur = int(dur_ms)/1000 if dur_ms else 0
-            except Exception:
-                dur = 0
-            if dur > max_video_seconds:
-                reason = f"too long ({dur:.1f}s)"
-                log_missing(folder_name, name, reason)
-                skipped[fid] = reason
-                save_json(SKIPPED_FILE, skipped)
-                continue
+        in_flight.discard(fid)
         try:
-            data = download_file(drive_service, fid)
-            token_str = upload_to_photos(token, data, name)
-            upload_tokens.append(token_str)
-            imported.add(fid)
-            save_json(IMPORTED_FILE, list(imported))
-            print(f"  ✅ Uploaded {name}")
+            tokens[parent].append(future.result())
+            mark_imported(imported, fid)
+            print(f"  ✅ Uploaded {names[parent]}/{name}")
         except Exception as e:
             err = str(e)
-            log_missing(folder_name, name, err)
-            skipped[fid] = err
-            save_json(SKIPPED_FILE, skipped)
-    if upload_tokens:
-        album_id = get_album_id(token, folder_name) or create_album(token, folder_name)
-        if album_id:
-            for i in range(0, len(upload_tokens), 50):
-                add_to_album(token, upload_tokens[i:i+50], album_id)
-            print(f"  🎉 Added {len(upload_tokens)} items to '{folder_name}'")
-        else:
-            print(f"⚠️ Could not create/find album '{folder_name}'")
-
-
-def run(root_folder_name: str, max_video_seconds: int, credentials_path: str, token_path: str):
+            log_missing(names[parent], name, err)
+            mark_skipped(skipped, fid, err)
+        remaining[parent] -= 1
+        return parent
+
+    def submit_tokens(fid):
+        batch, tokens[fid] = tokens[fid], []
+        if not batch or fid in album_failed:
+            return
+        future = submit_album_batch(session, album_index, names[fid], batch)
+        if future is None:
+            # Don't retry the album for every later batch of this folder
+            album_failed.add(fid)
+            log_missing(names[fid], '', 'album creation/fetch failed')
+            return
+        album_futures[future] = (fid, batch)
+        album_pending[fid] += 1
+
+    def record_album(future):
+        fid, batch = album_futures.pop(future)
+        try:
+            future.result()
+            album_added[fid] += len(batch)
+        except Exception as e:
+            print(f"  ❌ Failed to add {len(batch)} items to '{names[fid]}': {e}")
+            log_missing(names[fid], '', str(e))
+        album_pending[fid] -= 1
+        return fid
+
+    def settle(fid):
+        # Transfers are done once the folder has been fully listed and reaped
+        if fid in remaining:
+            if fid in listing_folders or remaining[fid]:
+                return
+            del remaining[fid]
+            submit_tokens(fid)
+            # Checkpoint at folder boundaries, between the flusher's timed writes
+            flush_state()
+        if album_pending[fid]:
+            return
+        if album_added[fid]:
+            print(f"  🎉 Added {album_added[fid]} items to '{names[fid]}'")
+        del names[fid], tokens[fid], album_pending[fid], album_added[fid]
+        album_failed.discard(fid)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            while queue or listing or futures or album_futures:
+                # Keep the pool fed, listing further folders only as it drains
+                while len(futures) < max_pending and (listing or queue):
+                    if listing is None:
+                        listing_folders = dict(queue)
+                        queue.clear()
+                        for fid, folder_name in listing_folders.items():
+                            print(f"\n📁 Processing: {folder_name}")
+                            names[fid] = folder_name
+                            remaining[fid] = 0
+                            tokens[fid] = []
+                            album_pending[fid] = 0
+                            album_added[fid] = 0
+                        listing = list_all_items(session, list(listing_folders))
+                    itm = next(listing, None)
+                    if itm is None:
+                        listing = None
+                        listed, listing_folders = listing_folders, {}
+                        for fid in listed:
+                            settle(fid)
+                        continue
+                    parent = next(p for p in itm.get('parents', []) if p in listing_folders)
+                    folder_name = listing_folders[parent]
+                    kind = check_item(itm, folder_name, imported, skipped, max_video_seconds)
+                    if kind == 'folder':
+                        queue.append((itm['id'], f"{folder_name}/{itm['name']}"))
+                    elif kind and itm['id'] not in in_flight:
+                        in_flight.add(itm['id'])
+                        future = pool.submit(transfer_file, session, itm)
+                        futures[future] = (itm, parent)
+                        remaining[parent] += 1
+
+                if futures or album_futures:
+                    done, _ = wait([*futures, *album_futures], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in album_futures:
+                            settle(record_album(future))
+                            continue
+                        parent = record_transfer(future)
+                        if len(tokens[parent]) >= ALBUM_BATCH_SIZE:
+                            submit_tokens(parent)
+                        settle(parent)
+        except BaseException:
+            # Drop queued transfers, let running ones finish, and keep their results
+            pool.shutdown(cancel_futures=True)
+            for future in list(futures):
+                if not future.cancelled():
+                    record_transfer(future)
+            # Imported files are never revisited, so still send their tokens
+            for fid in list(tokens):
+                try:
+                    submit_tokens(fid)
+                except Exception as e:
+                    log_missing(names[fid], '', str(e))
+            # Their files are already imported, so log any batch that fails now
+            for future in list(album_futures):
+                record_album(future)
+            raise
+
+
+def run(root_folder_name: str, max_video_seconds: int, credentials_path: str, token_path: str,
+        workers: int = TRANSFER_WORKERS):
     creds = authenticate(credentials_path, token_path)
-    drive_service = build('drive', 'v3', credentials=creds)
-    token = creds.token
+    session = build_session(creds, workers)
 
     # locate root folder by name
-    resp = drive_service.files().list(
-        q=(f"mimeType='application/vnd.google-apps.folder' and "
-           f"name='{root_folder_name}' and 'root' in parents"),
-        fields="files(id,name)"
-    ).execute()
+    resp = drive_list(session, {
+        "q": (f"mimeType='application/vnd.google-apps.folder' and "
+              f"name='{root_folder_name}' and 'root' in parents"),
+        "fields": "files(id,name)"
+    })
     files = resp.get('files', [])
     if not files:
         print(f"Root folder '{root_folder_name}' not found.")
@@ -241,15 +761,24 @@ def run(root_folder_name: str, max_video_seconds: int, credentials_path: str, to
 
     imported = set(load_json(IMPORTED_FILE, []))
     skipped = load_json(SKIPPED_FILE, {})
+    start_state_flusher(imported, skipped)
+    try:
+        # Album title -> ID, listed once up front and extended as albums are created
+        album_index = {}
+        for album in list_all_albums(session):
+            album_index.setdefault(album.get('title'), album.get('id'))
+
+        children = walk_pages(
+            session,
+            f"mimeType='application/vnd.google-apps.folder' and '{root_id}' in parents",
+            "files(id,name)"
+        )
 
-    children = drive_service.files().list(
-        q=f"mimeType='application/vnd.google-apps.folder' and '{root_id}' in parents",
-        fields="files(id,name)"
-    ).execute().get('files', [])
-
-    for child in children:
-        process_folder(
-            drive_service, token,
-            child['id'], child['name'],
-            imported, skipped, max_video_seconds
+        process_tree(
+            session,
+            [(child['id'], child['name']) for page in children for child in page],
+            imported, skipped, album_index, max_video_seconds, workers
         )
+    finally:
+        flush_state()
+        close_logs()